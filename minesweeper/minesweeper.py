@@ -1,6 +1,61 @@
+import collections
 import itertools
 import random
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        def decorate(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return decorate
+
+_LIMB_BITS = 64
+_LIMB_MASK = (1 << _LIMB_BITS) - 1
+
+
+@njit(cache=True)
+def _derive_differences(mask, count, masks, counts):
+    """
+    Derives difference sentences between one sentence (`mask`, a
+    limbs-long uint64 bitmask, with mine count `count`) and each
+    candidate in `masks`/`counts`. For every proper subset pair in
+    either direction, emits the sentence (superset & ~subset,
+    superset_count - subset_count). Returns the derived masks and
+    counts.
+    """
+    K, L = masks.shape
+    out_masks = np.zeros((K, L), dtype=np.uint64)
+    out_counts = np.zeros(K, dtype=np.int64)
+    n = 0
+    for a in range(K):
+        # Is the sentence a subset of candidate a, and vice versa?
+        sent_in_cand = True
+        cand_in_sent = True
+        for l in range(L):
+            if mask[l] & ~masks[a, l] != 0:
+                sent_in_cand = False
+            if masks[a, l] & ~mask[l] != 0:
+                cand_in_sent = False
+        if sent_in_cand and cand_in_sent:
+            continue
+        if sent_in_cand:
+            for l in range(L):
+                out_masks[n, l] = masks[a, l] & ~mask[l]
+            out_counts[n] = counts[a] - count
+            n += 1
+        elif cand_in_sent:
+            for l in range(L):
+                out_masks[n, l] = mask[l] & ~masks[a, l]
+            out_counts[n] = count - counts[a]
+            n += 1
+    return out_masks[:n], out_counts[:n]
+
 
 class Minesweeper():
     """
@@ -12,23 +67,18 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        self.board = np.zeros((height, width), dtype=bool)
+
+        # Add mines randomly (sample distinct flat indices, no rejections)
+        flat = random.sample(range(height * width), mines)
+        self.board.flat[flat] = True
+        self.mines = {divmod(k, width) for k in flat}
+
+        # Summed-area table of the board (built once; the board never
+        # changes after construction), so neighbor counts are O(1)
+        self._sat = self.board.astype(np.int32).cumsum(0).cumsum(1)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -38,19 +88,17 @@ class Minesweeper():
         Prints a text-based representation
         of where mines are located.
         """
-        for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
+        border = "-" * (2 * self.width + 1)
+        lines = [border]
+        for row in self.board:
+            lines.append(
+                "".join("|X" if cell else "| " for cell in row) + "|"
+            )
+            lines.append(border)
+        print("\n".join(lines))
 
     def is_mine(self, cell):
-        i, j = cell
-        return self.board[i][j]
+        return bool(self.board[cell])
 
     def nearby_mines(self, cell):
         """
@@ -58,24 +106,21 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        r0, c0 = max(0, i - 1), max(0, j - 1)
+        r1, c1 = min(self.height - 1, i + 1), min(self.width - 1, j + 1)
+
+        # Four summed-area-table lookups give the 3x3 block total,
+        # then the cell itself is excluded
+        sat = self._sat
+        total = int(sat[r1, c1])
+        if r0 > 0:
+            total -= int(sat[r0 - 1, c1])
+        if c0 > 0:
+            total -= int(sat[r1, c0 - 1])
+        if r0 > 0 and c0 > 0:
+            total += int(sat[r0 - 1, c0 - 1])
+        return total - int(self.board[i, j])
 
     def won(self):
         """
@@ -87,57 +132,77 @@ class Minesweeper():
 class Sentence():
     """
     Logical statement about a Minesweeper game
-    A sentence consists of a set of board cells,
-    and a count of the number of those cells which are mines.
+    A sentence consists of a bitmask of board cells (bit i*width+j set
+    means cell (i, j) is in the sentence), and a count of the number
+    of those cells which are mines.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    def __init__(self, mask, count):
+        self.mask = mask
         self.count = count
+        self._update_flags()
 
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        return self.mask == other.mask and self.count == other.count
+
+    def __hash__(self):
+        # Sentences mutate via mark_*; holders rehash by reinserting
+        # (see MinesweeperAI._rekey)
+        return hash((self.mask, self.count))
 
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{self.mask:b} = {self.count}"
+
+    def _update_flags(self):
+        """
+        Recomputes the cached all-mines/all-safes status. Only called
+        when membership actually changes, so known_mines/known_safes
+        stay O(1).
+        """
+        self._is_all_mines = self.count == self.mask.bit_count()
+        self._is_all_safes = self.count == 0
 
     def known_mines(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Returns the bitmask of cells known to be mines (0 if none).
         """
         # All neighbouring cells are mines
-        if self.count == len(self.cells):
-            return self.cells
-        
-        return set()
+        if self._is_all_mines:
+            return self.mask
+
+        return 0
 
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitmask of cells known to be safe (0 if none).
         """
         # All neighbouring cells must be safe
-        if self.count == 0:
-            return self.cells
+        if self._is_all_safes:
+            return self.mask
 
-        return set()
-        
-    def mark_mine(self, cell):
+        return 0
+
+    def mark_mine(self, idx):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        the cell with flat index `idx` is known to be a mine.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        bit = 1 << idx
+        if self.mask & bit:
+            self.mask ^= bit
             self.count -= 1
-        
-    def mark_safe(self, cell):
+            self._update_flags()
+
+    def mark_safe(self, idx):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        the cell with flat index `idx` is known to be safe.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-         
+        bit = 1 << idx
+        if self.mask & bit:
+            self.mask ^= bit
+            self._update_flags()
+
 
 class MinesweeperAI():
     """
@@ -150,35 +215,148 @@ class MinesweeperAI():
         self.height = height
         self.width = width
 
+        # Number of 64-bit limbs needed to hold a board bitmask
+        self._limbs = (height * width + _LIMB_BITS - 1) // _LIMB_BITS
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
+        # Cells still playable at random: not moved on, not known mines
+        self.available = {
+            (r, c) for r in range(height) for c in range(width)
+        }
+
         # Keep track of cells known to be safe or mines
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Known-safe cells that have not been played yet
+        self.safe_unplayed = set()
+
+        # Same knowledge as board bitmasks, matching the sentence
+        # encoding, for O(1) filtering of neighbor lookups
+        self.mine_bits = 0
+        self.safe_bits = 0
+
+        # Per-cell neighbor bitmasks, hoisted out of add_knowledge:
+        # bit r*width+c is set for every in-bounds neighbor (r, c)
+        self.neighbor_mask = [0] * (height * width)
+        for i in range(height):
+            for j in range(width):
+                mask = 0
+                for r in range(i - 1, i + 2):
+                    for c in range(j - 1, j + 2):
+                        if ((r, c) != (i, j)
+                                and 0 <= r < height and 0 <= c < width):
+                            mask |= 1 << (r * width + c)
+                self.neighbor_mask[i * width + j] = mask
+
+        # Sentences about the game known to be true, keyed by their
+        # cell bitmask so deduplication is a hash lookup
+        self.knowledge = {}
+
+        # Inverted index: flat cell index -> set of knowledge keys
+        # containing it, so only sentences actually touching a cell
+        # are revisited
+        self.cell_to_sents = {}
+
+        # Propagation queue of sentences that are new or have shrunk
+        # and still need resolving/deriving
+        self.worklist = collections.deque()
+
+    @staticmethod
+    def _bits(mask):
+        """
+        Yields the flat cell indices set in a bitmask.
+        """
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _cells_of(self, mask):
+        """
+        Decodes a bitmask into a list of (i, j) cells.
+        """
+        return [divmod(idx, self.width) for idx in self._bits(mask)]
+
+    def _add_sentence(self, mask, count):
+        """
+        Inserts a new sentence into the knowledge base and the
+        inverted index, unless it is empty or already known.
+        """
+        if not mask or mask in self.knowledge:
+            return
+        sentence = Sentence(mask, count)
+        self.knowledge[mask] = sentence
+        for idx in self._bits(mask):
+            self.cell_to_sents.setdefault(idx, set()).add(mask)
+        self.worklist.append(sentence)
+
+    def _unindex(self, key):
+        """
+        Removes a knowledge key from the inverted index.
+        """
+        for idx in self._bits(key):
+            sents = self.cell_to_sents.get(idx)
+            if sents is not None:
+                sents.discard(key)
+                if not sents:
+                    del self.cell_to_sents[idx]
+
+    def _rekey(self, key):
+        """
+        Reinserts the sentence stored under `key` after its mask
+        changed, dropping it if it emptied or an identical sentence
+        already exists.
+        """
+        sentence = self.knowledge.pop(key)
+        self._unindex(key)
+        new_key = sentence.mask
+        if new_key and new_key not in self.knowledge:
+            self.knowledge[new_key] = sentence
+            for idx in self._bits(new_key):
+                self.cell_to_sents.setdefault(idx, set()).add(new_key)
+            self.worklist.append(sentence)
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
-        to mark that cell as a mine as well.
+        to mark that cell as a mine as well. Cells already known to
+        be mines are not re-broadcast.
         """
+        if cell in self.mines:
+            return
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
-        
+        self.available.discard(cell)
+        idx = cell[0] * self.width + cell[1]
+        self.mine_bits |= 1 << idx
+        sents = self.cell_to_sents.get(idx)
+        if sents:
+            # Snapshot the keys; _rekey mutates the index entry
+            for key in list(sents):
+                self.knowledge[key].mark_mine(idx)
+                self._rekey(key)
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
-        to mark that cell as safe as well.
+        to mark that cell as safe as well. Cells already known to be
+        safe are not re-broadcast.
         """
+        if cell in self.safes:
+            return
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
-        
+        if cell not in self.moves_made:
+            self.safe_unplayed.add(cell)
+        idx = cell[0] * self.width + cell[1]
+        self.safe_bits |= 1 << idx
+        sents = self.cell_to_sents.get(idx)
+        if sents:
+            # Snapshot the keys; _rekey mutates the index entry
+            for key in list(sents):
+                self.knowledge[key].mark_safe(idx)
+                self._rekey(key)
 
     def add_knowledge(self, cell, count):
         """
@@ -196,48 +374,85 @@ class MinesweeperAI():
                if they can be inferred from existing knowledge
         """
         self.moves_made.add(cell)
-        if cell not in self.safes:
-            self.mark_safe(cell)
-
-        neighbour_cells = set()
-        for row in range(cell[0]-1, cell[0]+2):
-            if 0 <= row < self.height:
-                for col in range(cell[1]-1, cell[1]+2):
-                    if 0 <= col < self.width:
-                        # Only add non-safe mines (to be more specific in sentence)
-                        if (row, col) not in self.safes:
-                            neighbour_cells.add((row, col))
-        
-        # Remove all the known mines from neighbour_cells (and adjust mines count)
-        known_mines_in_neighbours = {c for c in neighbour_cells if c in self.mines}
-        neighbour_cells -= known_mines_in_neighbours
-        count -= len(known_mines_in_neighbours)
-
-        new_sentence = Sentence(neighbour_cells, count)
-        if new_sentence not in self.knowledge and new_sentence.cells:
-            self.knowledge.append(new_sentence)
+        self.available.discard(cell)
+        self.safe_unplayed.discard(cell)
+        self.mark_safe(cell)
+
+        # Unknown neighbors come straight from the precomputed
+        # neighbor mask; known safes and mines are dropped from the
+        # sentence, and the count is reduced by the known mines
+        neighbours = self.neighbor_mask[cell[0] * self.width + cell[1]]
+        count -= (neighbours & self.mine_bits).bit_count()
+        neighbour_mask = neighbours & ~(self.safe_bits | self.mine_bits)
+
+        self._add_sentence(neighbour_mask, count)
 
         # Update knowledge and make inferences
-        for sentence in self.knowledge:            
-            # If sentence is complete (all mines/all safes update safes/mines)
-            sentence_safes = sentence.known_safes().copy()
-            sentence_mines = sentence.known_mines().copy()
-
-            for cell in sentence_safes:
-                self.mark_safe(cell)
-            for cell in sentence_mines:
-                self.mark_mine(cell)
-
-            self.knowledge = [s for s in self.knowledge if len(s.cells) > 0]
-
-            for other_sentence in self.knowledge:
-                if (sentence != other_sentence) and other_sentence.cells.issubset(sentence.cells):
-                        difference_cells = sentence.cells - other_sentence.cells
-                        difference_count = sentence.count - other_sentence.count
-
-                        subset_sentence = Sentence(difference_cells, difference_count)
-                        if subset_sentence not in self.knowledge:
-                            self.knowledge.append(subset_sentence)
+        self._infer()
+
+    def _infer(self):
+        """
+        Drains the propagation queue: each pending sentence is
+        resolved if saturated, then difference sentences are derived
+        against the sentences sharing a cell with it. Work done is
+        proportional to what changed, not to knowledge-base size.
+        """
+        while self.worklist:
+            sentence = self.worklist.popleft()
+
+            # Skip sentences dropped or superseded since being queued
+            if self.knowledge.get(sentence.mask) is not sentence:
+                continue
+
+            # Classify the sentence once -- fully safe, fully mine, or
+            # indeterminate -- and broadcast saturated cells from a
+            # snapshot, since mark_* mutates the mask
+            if sentence._is_all_safes:
+                for cell in self._cells_of(sentence.mask):
+                    self.mark_safe(cell)
+            elif sentence._is_all_mines:
+                for cell in self._cells_of(sentence.mask):
+                    self.mark_mine(cell)
+
+            if not sentence.mask:
+                continue
+
+            self._derive_subsets(sentence)
+
+    def _derive_subsets(self, sentence):
+        """
+        Runs one compiled pass deriving difference sentences between
+        `sentence` and its candidates from the inverted index (the
+        only sentences that can be its subset or superset).
+        """
+        candidates = set()
+        for idx in self._bits(sentence.mask):
+            sents = self.cell_to_sents.get(idx)
+            if sents:
+                candidates.update(sents)
+        candidates.discard(sentence.mask)
+        if not candidates:
+            return
+
+        mask = np.zeros(self._limbs, dtype=np.uint64)
+        for l in range(self._limbs):
+            mask[l] = (sentence.mask >> (_LIMB_BITS * l)) & _LIMB_MASK
+        masks = np.zeros((len(candidates), self._limbs), dtype=np.uint64)
+        counts = np.empty(len(candidates), dtype=np.int64)
+        for k, key in enumerate(candidates):
+            counts[k] = self.knowledge[key].count
+            for l in range(self._limbs):
+                masks[k, l] = (key >> (_LIMB_BITS * l)) & _LIMB_MASK
+
+        new_masks, new_counts = _derive_differences(
+            mask, sentence.count, masks, counts
+        )
+
+        for k in range(len(new_counts)):
+            derived = 0
+            for l in range(self._limbs):
+                derived |= int(new_masks[k, l]) << (_LIMB_BITS * l)
+            self._add_sentence(derived, int(new_counts[k]))
             
             
     def make_safe_move(self):
@@ -249,10 +464,7 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for safe_cell in self.safes:
-            if safe_cell not in self.moves_made:
-                return safe_cell 
-        return None
+        return next(iter(self.safe_unplayed), None)
 
     def make_random_move(self):
         """
@@ -261,24 +473,6 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        row = random.randrange(self.height)
-        col = random.randrange(self.width)
-        cell = (row, col)
-        counter = 0
-        while(cell in self.mines or cell in self.moves_made):
-            row = random.randrange(self.height)
-            col = random.randrange(self.width)
-            cell = (row, col)
-            counter += 1
-            if counter >= 10:
-                break
-        if counter < 10:
-            return cell
-        
-        else:
-            for row in range(self.height):
-                for col in range(self.width):
-                    cell = (row, col)
-                    if cell not in self.mines and cell not in self.moves_made:
-                        return cell
+        if self.available:
+            return random.choice(tuple(self.available))
         return None
\ No newline at end of file